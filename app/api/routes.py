@@ -1,22 +1,76 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
 from sqlalchemy.orm import Session
 from ..db import get_db
-from ..models import Report
-from ..schema import ReportResponse, ReportStatusResponse
+from ..models import Report, StoreStatus
+from ..schema import ReportResponse, ReportStatusResponse, StoreStatusCreate, StoreStatusIngestResponse
 from datetime import datetime
+from typing import Optional
 import uuid
 import os
+import pytz
 from ..utils.uptime_calculator import generate_report
+from ..utils.trend_calculator import generate_trend_report, TREND_BUCKETS, TREND_LAYOUTS, DEFAULT_TREND_DAYS, MAX_TREND_DAYS
+from ..utils.alert_engine import create_alert_engine_from_env
 from fastapi.responses import FileResponse
 
 router = APIRouter()
 
+# Shared streaming evaluator for live polls
+alert_engine = create_alert_engine_from_env()
+
+@router.post("/store_status", response_model=StoreStatusIngestResponse)
+def ingest_store_status(poll: StoreStatusCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    """
+    Ingest a single live store poll and feed it to the downtime alert engine
+    """
+    # Store naive UTC timestamps like the CSV loader does
+    timestamp_utc = poll.timestamp_utc
+    if timestamp_utc.tzinfo is not None:
+        timestamp_utc = timestamp_utc.astimezone(pytz.UTC).replace(tzinfo=None)
+    
+    store_status = StoreStatus(
+        store_id=poll.store_id,
+        timestamp_utc=timestamp_utc,
+        status=poll.status
+    )
+    db.add(store_status)
+    db.commit()
+    
+    alert = alert_engine.process_poll(db, poll.store_id, timestamp_utc, poll.status)
+    
+    # Deliver the alert after the response so a slow sink never holds up ingestion
+    if alert:
+        background_tasks.add_task(alert_engine.send_alert, alert)
+    
+    return {"id": store_status.id, "alert": alert}
+
 @router.post("/trigger_report", response_model=ReportResponse)
-def trigger_report(background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+def trigger_report(
+    background_tasks: BackgroundTasks,
+    report_type: str = Query("standard", alias="type"),
+    bucket: str = "day",
+    days: Optional[int] = None,
+    layout: str = "long",
+    db: Session = Depends(get_db)
+):
     """
     Trigger the generation of a store uptime/downtime report
+    type=trend builds uptime/downtime per local time bucket (hour, day or week) over the last `days` days
     Returns a report_id that can be used to poll for the report status
     """
+    if report_type not in ("standard", "trend"):
+        raise HTTPException(status_code=400, detail="type must be 'standard' or 'trend'")
+    
+    if report_type == "trend":
+        if bucket not in TREND_BUCKETS:
+            raise HTTPException(status_code=400, detail=f"bucket must be one of {', '.join(TREND_BUCKETS)}")
+        if layout not in TREND_LAYOUTS:
+            raise HTTPException(status_code=400, detail=f"layout must be one of {', '.join(TREND_LAYOUTS)}")
+        if days is None:
+            days = DEFAULT_TREND_DAYS
+        if not 1 <= days <= MAX_TREND_DAYS:
+            raise HTTPException(status_code=400, detail=f"days must be between 1 and {MAX_TREND_DAYS}")
+    
     report_id = str(uuid.uuid4())
     
     # Create a new report record
@@ -29,7 +83,10 @@ def trigger_report(background_tasks: BackgroundTasks, db: Session = Depends(get_
     db.commit()
     
     # Trigger report generation in the background
-    background_tasks.add_task(process_report, report_id, db)
+    if report_type == "trend":
+        background_tasks.add_task(process_report, report_id, db, generate_trend_report, bucket=bucket, days=days, layout=layout)
+    else:
+        background_tasks.add_task(process_report, report_id, db)
     
     return {"report_id": report_id}
 
@@ -59,7 +116,7 @@ def get_report(report_id: str, db: Session = Depends(get_db)):
         filename=f"store_uptime_report_{report_id}.csv"
     )
 
-def process_report(report_id: str, db: Session):
+def process_report(report_id: str, db: Session, generator=generate_report, **options):
     """
     Background task to generate the report
     """
@@ -76,7 +133,7 @@ def process_report(report_id: str, db: Session):
             return
         
         # Generate the report
-        file_path = generate_report(db, report_id)
+        file_path = generator(db, report_id, **options)
         
         # Update the report status
         report.status = "complete"
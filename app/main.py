@@ -4,6 +4,7 @@ import os
 from .db import engine, get_db, Base
 from .api.routes import router as api_router
 from .utils.csv_loader import load_all_data
+from .utils.metadata_index import ensure_metadata_index
 
 # Create the database tables
 Base.metadata.create_all(bind=engine)
@@ -34,6 +35,8 @@ async def startup_event():
                 load_all_data(db)
         else:
             print("Data already loaded, skipping import")
+            # Rebuild the metadata index if it came from another database
+            ensure_metadata_index(db)
     except Exception as e:
         print(f"Error during startup: {e}")
         import traceback
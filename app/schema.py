@@ -1,6 +1,6 @@
 #schema.py
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Literal
 from datetime import datetime
 
 class ReportResponse(BaseModel):
@@ -10,6 +10,15 @@ class ReportStatusResponse(BaseModel):
     status: str
     file_url: Optional[str] = None
 
+class StoreStatusCreate(BaseModel):
+    store_id: str
+    timestamp_utc: datetime
+    status: Literal["active", "inactive"]
+
+class StoreStatusIngestResponse(BaseModel):
+    id: int
+    alert: Optional[dict] = None
+
 class StoreUptimeReport(BaseModel):
     store_id: str
     # Original time measurements
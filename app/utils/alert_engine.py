@@ -0,0 +1,139 @@
+#alert_engine.py
+import json
+import os
+import threading
+import urllib.request
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from sqlalchemy.orm import Session
+from .uptime_calculator import get_store_timezone, get_business_hours, get_open_time
+
+DEFAULT_THRESHOLD_MINUTES = 60
+
+class FileAlertSink:
+    """Append alerts as JSON lines to a local file"""
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+
+    def send(self, alert: Dict) -> None:
+        # Create the directory on the first alert, not when the app is imported
+        directory = os.path.dirname(self.file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.file_path, 'a') as f:
+            f.write(json.dumps(alert) + "\n")
+
+class WebhookAlertSink:
+    """POST alerts as JSON to a (local) webhook URL"""
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, alert: Dict) -> None:
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(alert).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+            method='POST'
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+class StoreRunState:
+    """Current inactive run of a single store"""
+    __slots__ = ("last_timestamp", "last_status", "run_start", "open_downtime", "alerted")
+
+    def __init__(self):
+        self.last_timestamp: Optional[datetime] = None
+        self.last_status: Optional[str] = None
+        self.run_start: Optional[datetime] = None
+        self.open_downtime = timedelta(0)
+        self.alerted = False
+
+class DowntimeAlertEngine:
+    """
+    Streaming evaluator for newly ingested store polls.
+    Keeps one StoreRunState per store and reports a single alert when a store stays
+    inactive for more than threshold_minutes of its business hours. Like the report,
+    the gap after a poll takes that poll's status, and only its open-hours part counts.
+    Timezone and business hours come from the shared metadata index when it is built.
+    Run state lives in this process, so all polls of a store must reach the same worker.
+    """
+
+    def __init__(self, sink, threshold_minutes: int = DEFAULT_THRESHOLD_MINUTES):
+        self.sink = sink
+        self.threshold = timedelta(minutes=threshold_minutes)
+        self._states: Dict[str, StoreRunState] = {}
+        self._lock = threading.Lock()
+
+    def process_poll(self, db: Session, store_id: str, timestamp_utc: datetime, status: str) -> Optional[Dict]:
+        """
+        Feed one poll into the state machine
+        Returns the alert to send, if any; use send_alert to deliver it
+        """
+        # Metadata lookups stay outside the lock so a slow lookup never blocks other stores
+        timezone_str = get_store_timezone(store_id, db)
+        business_hours = get_business_hours(store_id, db)
+
+        with self._lock:
+            state = self._states.get(store_id)
+            if state is None:
+                state = StoreRunState()
+                self._states[store_id] = state
+
+            # Polls arriving out of order cannot extend or break the current run
+            if state.last_timestamp is not None and timestamp_utc <= state.last_timestamp:
+                return None
+            previous_timestamp, previous_status = state.last_timestamp, state.last_status
+            state.last_timestamp, state.last_status = timestamp_utc, status
+
+            # An active poll ends the current run
+            if status != "inactive":
+                state.run_start = None
+                state.open_downtime = timedelta(0)
+                state.alerted = False
+                return None
+
+            if state.run_start is None:
+                state.run_start = timestamp_utc
+                return None
+
+            # The gap since an inactive poll is downtime, but only while the store is open
+            if previous_status == "inactive":
+                state.open_downtime += get_open_time(previous_timestamp, timestamp_utc, timezone_str, business_hours)
+            if state.alerted or state.open_downtime <= self.threshold:
+                return None
+
+            state.alerted = True
+            return {
+                "store_id": store_id,
+                "inactive_since_utc": state.run_start.isoformat(),
+                "detected_at_utc": timestamp_utc.isoformat(),
+                "inactive_minutes": round(state.open_downtime.total_seconds() / 60, 2),
+                "threshold_minutes": self.threshold.total_seconds() / 60,
+                "timezone": timezone_str
+            }
+
+    def send_alert(self, alert: Dict) -> None:
+        """Deliver an alert to the sink, meant to run outside the request (e.g. BackgroundTasks)"""
+        try:
+            self.sink.send(alert)
+        except Exception as e:
+            print(f"Error sending downtime alert for store {alert['store_id']}: {e}")
+
+def create_alert_engine_from_env() -> DowntimeAlertEngine:
+    """
+    Build an alert engine from environment variables
+    ALERT_WEBHOOK_URL: send alerts to this webhook, otherwise append to ALERT_FILE_PATH
+    ALERT_THRESHOLD_MINUTES: minutes of inactivity during business hours before alerting
+    """
+    threshold_minutes = int(os.environ.get("ALERT_THRESHOLD_MINUTES", DEFAULT_THRESHOLD_MINUTES))
+    webhook_url = os.environ.get("ALERT_WEBHOOK_URL")
+    if webhook_url:
+        sink = WebhookAlertSink(webhook_url)
+    else:
+        default_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'alerts', 'downtime_alerts.jsonl')
+        sink = FileAlertSink(os.environ.get("ALERT_FILE_PATH", default_path))
+    return DowntimeAlertEngine(sink, threshold_minutes)
@@ -4,6 +4,8 @@ import os
 from datetime import datetime
 from sqlalchemy.orm import Session
 from ..models import StoreStatus, BusinessHours, StoreTimezone
+from .metadata_index import build_metadata_index
+from .uptime_calculator import DEFAULT_TIMEZONE
 import io
 import pytz
 from datetime import time
@@ -143,15 +145,15 @@ def load_store_timezone(file_path, db: Session):
         
         for row in csv_reader:
             # Handle missing or invalid timezone data
-            timezone_str = row.get('timezone_str', 'America/Chicago')
+            timezone_str = row.get('timezone_str', DEFAULT_TIMEZONE)
             if not timezone_str or timezone_str.strip() == '':
-                timezone_str = 'America/Chicago'
+                timezone_str = DEFAULT_TIMEZONE
             
             # Validate timezone
             try:
                 pytz.timezone(timezone_str)
             except pytz.exceptions.UnknownTimeZoneError:
-                timezone_str = 'America/Chicago'
+                timezone_str = DEFAULT_TIMEZONE
             
             store_timezone = StoreTimezone(
                 store_id=row['store_id'],
@@ -214,6 +216,9 @@ def load_all_data(db: Session, zip_path=None):
                 print("CSV files not found in data directory and no zip file provided.")
                 print(f"Missing files: {[f for f in [status_file, hours_file, timezone_file] if not os.path.exists(f)]}")
         
+        # Compile timezones and business hours for memory-mapped lookups in every worker
+        build_metadata_index(db)
+        
         print("Data loading complete!")
     except Exception as e:
         print(f"Error loading data: {e}")
@@ -0,0 +1,232 @@
+#metadata_index.py
+import hashlib
+import mmap
+import os
+import struct
+import threading
+from datetime import time
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from ..models import BusinessHours, StoreTimezone
+from .uptime_calculator import DEFAULT_TIMEZONE, ALWAYS_OPEN
+from typing import Dict, List, Optional, Tuple
+
+# Binary layout (little endian):
+#   header    magic, version, source fingerprint, slot_count, store_count, tz_count, tz_table_offset, strings_offset, intervals_offset
+#   slots     slot_count open-addressing slots keyed by a 64-bit hash of the store id, empty unless `used` is set
+#   tz table  tz_count (offset, length) pairs into the string pool
+#   strings   utf-8 store ids and timezone names
+#   intervals (day_of_week, start_seconds, end_seconds) packed per store
+MAGIC = b"SMLT"
+VERSION = 2
+HEADER = struct.Struct('<4sI16sIIIIII')
+SLOT = struct.Struct('<QIHHIIB3x')  # hash, key_offset, key_len, tz_id, interval_index, interval_count, used
+TZ_ENTRY = struct.Struct('<IH')  # offset, length
+INTERVAL = struct.Struct('<BII')  # day_of_week, start_seconds, end_seconds
+
+DEFAULT_INDEX_PATH = os.environ.get(
+    "METADATA_INDEX_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'store_metadata.idx')
+)
+
+def hash_store_id(key: bytes) -> int:
+    """Stable 64-bit hash of a store id (Python's hash() is salted per process)"""
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), 'little')
+
+def _time_to_seconds(value: time) -> int:
+    return value.hour * 3600 + value.minute * 60 + value.second
+
+def _seconds_to_time(seconds: int) -> time:
+    return time(seconds // 3600, seconds % 3600 // 60, seconds % 60)
+
+def compute_source_fingerprint(db: Session) -> bytes:
+    """
+    Fingerprint the database the index is built from: its location plus the row count
+    and max id of store_timezone and business_hours
+    """
+    url = db.get_bind().url
+    if url.get_backend_name() == "sqlite" and url.database:
+        source = os.path.abspath(url.database)
+    else:
+        source = url.render_as_string(hide_password=True)
+
+    parts = [source]
+    for model in (StoreTimezone, BusinessHours):
+        count, max_id = db.query(func.count(model.id), func.max(model.id)).one()
+        parts.append(f"{model.__tablename__}:{count}:{max_id}")
+    return hashlib.blake2b("|".join(parts).encode('utf-8'), digest_size=16).digest()
+
+def build_metadata_index(db: Session, index_path: str = DEFAULT_INDEX_PATH) -> str:
+    """
+    Compile store_timezone and business_hours into a read-only binary lookup file
+    The file is written to a temporary path and renamed so readers never see a partial file
+    Returns the path to the index file
+    """
+    fingerprint = compute_source_fingerprint(db)
+    timezones = {store_id: timezone_str for store_id, timezone_str in db.query(StoreTimezone.store_id, StoreTimezone.timezone_str)}
+
+    hours: Dict[str, List[Tuple[int, int, int]]] = {}
+    rows = db.query(BusinessHours.store_id, BusinessHours.day_of_week, BusinessHours.start_time_local, BusinessHours.end_time_local)
+    for store_id, day, start_time, end_time in rows:
+        hours.setdefault(store_id, []).append((day, _time_to_seconds(start_time), _time_to_seconds(end_time)))
+
+    store_ids = sorted(set(timezones) | set(hours))
+
+    # Timezone ids, with the default always at id 0
+    tz_names = [DEFAULT_TIMEZONE] + sorted(set(timezones.values()) - {DEFAULT_TIMEZONE})
+    tz_ids = {name: i for i, name in enumerate(tz_names)}
+
+    strings = bytearray()
+    tz_entries = []
+    for name in tz_names:
+        encoded = name.encode('utf-8')
+        tz_entries.append((len(strings), len(encoded)))
+        strings += encoded
+
+    # Power of two table at most half full keeps probe chains short
+    slot_count = 8
+    while slot_count < len(store_ids) * 2:
+        slot_count *= 2
+    slots = [None] * slot_count
+
+    intervals = bytearray()
+    interval_index = 0
+    for store_id in store_ids:
+        key = store_id.encode('utf-8')
+        key_offset = len(strings)
+        strings += key
+
+        store_hours = sorted(hours.get(store_id, []))
+        for interval in store_hours:
+            intervals += INTERVAL.pack(*interval)
+
+        key_hash = hash_store_id(key)
+        slot = key_hash & (slot_count - 1)
+        while slots[slot] is not None:
+            slot = (slot + 1) & (slot_count - 1)
+        tz_id = tz_ids[timezones.get(store_id, DEFAULT_TIMEZONE)]
+        slots[slot] = (key_hash, key_offset, len(key), tz_id, interval_index, len(store_hours), 1)
+        interval_index += len(store_hours)
+
+    tz_table_offset = HEADER.size + slot_count * SLOT.size
+    strings_offset = tz_table_offset + len(tz_entries) * TZ_ENTRY.size
+    intervals_offset = strings_offset + len(strings)
+
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, fingerprint, slot_count, len(store_ids), len(tz_names), tz_table_offset, strings_offset, intervals_offset))
+        empty_slot = SLOT.pack(0, 0, 0, 0, 0, 0, 0)
+        for entry in slots:
+            f.write(SLOT.pack(*entry) if entry is not None else empty_slot)
+        for entry in tz_entries:
+            f.write(TZ_ENTRY.pack(*entry))
+        f.write(strings)
+        f.write(intervals)
+    os.replace(tmp_path, index_path)
+
+    print(f"Built metadata index for {len(store_ids)} stores at {index_path}")
+    return index_path
+
+class MetadataIndex:
+    """
+    Read-only, memory-mapped view of a compiled metadata index
+    Pages are shared between all processes mapping the same file
+    """
+
+    def __init__(self, index_path: str):
+        self.index_path = index_path
+        with open(index_path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.inode = os.fstat(f.fileno()).st_ino
+        self._view = memoryview(self._mm)
+
+        magic, version, self.fingerprint, self.slot_count, self.store_count, tz_count, tz_table_offset, self._strings_offset, self._intervals_offset = \
+            HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"Unsupported metadata index file: {index_path}")
+
+        # Few distinct timezones, decode them once
+        self._timezones = []
+        for i in range(tz_count):
+            offset, length = TZ_ENTRY.unpack_from(self._mm, tz_table_offset + i * TZ_ENTRY.size)
+            start = self._strings_offset + offset
+            self._timezones.append(bytes(self._view[start:start + length]).decode('utf-8'))
+
+    def close(self) -> None:
+        self._view.release()
+        self._mm.close()
+
+    def _find_slot(self, store_id: str) -> Optional[Tuple[int, int, int]]:
+        """Return (tz_id, interval_index, interval_count) for a store, or None if absent"""
+        key = store_id.encode('utf-8')
+        key_hash = hash_store_id(key)
+        mask = self.slot_count - 1
+        slot = key_hash & mask
+        while True:
+            entry_hash, key_offset, key_len, tz_id, interval_index, interval_count, used = \
+                SLOT.unpack_from(self._mm, HEADER.size + slot * SLOT.size)
+            if not used:
+                return None
+            if entry_hash == key_hash:
+                start = self._strings_offset + key_offset
+                if self._view[start:start + key_len] == key:
+                    return tz_id, interval_index, interval_count
+            slot = (slot + 1) & mask
+
+    def get_timezone(self, store_id: str) -> str:
+        """Get the timezone for a store, default to America/Chicago if not found"""
+        entry = self._find_slot(store_id)
+        return self._timezones[entry[0]] if entry else DEFAULT_TIMEZONE
+
+    def get_business_hours(self, store_id: str) -> Dict[int, List[Tuple[time, time]]]:
+        """Get business hours for a store in the same shape as uptime_calculator.get_business_hours"""
+        entry = self._find_slot(store_id)
+        business_hours = {}
+        if entry:
+            _, interval_index, interval_count = entry
+            offset = self._intervals_offset + interval_index * INTERVAL.size
+            for day, start_seconds, end_seconds in INTERVAL.iter_unpack(self._view[offset:offset + interval_count * INTERVAL.size]):
+                business_hours.setdefault(day, []).append((_seconds_to_time(start_seconds), _seconds_to_time(end_seconds)))
+
+        # If no business hours, assume 24/7
+        if not business_hours:
+            business_hours = {day: list(hours) for day, hours in ALWAYS_OPEN.items()}
+
+        return business_hours
+
+_index: Optional[MetadataIndex] = None
+_index_lock = threading.Lock()
+
+def get_metadata_index(index_path: Optional[str] = None) -> Optional[MetadataIndex]:
+    """
+    Get this process's mapping of the metadata index, or None if it has not been built
+    The file is remapped when csv_loader replaces it with a new build
+    """
+    global _index
+    if index_path is None:
+        index_path = DEFAULT_INDEX_PATH
+    try:
+        inode = os.stat(index_path).st_ino
+    except FileNotFoundError:
+        return None
+
+    with _index_lock:
+        if _index is None or _index.index_path != index_path or _index.inode != inode:
+            try:
+                _index = MetadataIndex(index_path)
+            except (OSError, ValueError) as e:
+                print(f"Could not open metadata index {index_path}: {e}")
+                _index = None
+        return _index
+
+def ensure_metadata_index(db: Session, index_path: str = DEFAULT_INDEX_PATH) -> Optional[MetadataIndex]:
+    """
+    Rebuild the metadata index if it is missing, unreadable or was built from another database
+    Returns this process's mapping of the up to date index
+    """
+    index = get_metadata_index(index_path)
+    if index is None or index.fingerprint != compute_source_fingerprint(db):
+        build_metadata_index(db, index_path)
+        index = get_metadata_index(index_path)
+    return index
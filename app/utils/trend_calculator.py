@@ -0,0 +1,181 @@
+#trend_calculator.py
+import csv
+import os
+import pytz
+from datetime import datetime, timedelta, time
+from sqlalchemy.orm import Session
+from ..models import StoreStatus, BusinessHours, StoreTimezone
+from .uptime_calculator import get_current_timestamp, is_within_business_hours, get_open_time, REPORTS_DIR, DEFAULT_TIMEZONE, ALWAYS_OPEN
+from typing import Dict, List, Tuple
+
+TREND_BUCKETS = ("hour", "day", "week")
+TREND_LAYOUTS = ("long", "wide")
+DEFAULT_TREND_DAYS = 90
+MAX_TREND_DAYS = 3660  # about ten years
+
+def load_all_timezones(db: Session) -> Dict[str, str]:
+    """Get the timezone of every store in one query"""
+    return {store_id: timezone_str for store_id, timezone_str in db.query(StoreTimezone.store_id, StoreTimezone.timezone_str)}
+
+def load_all_business_hours(db: Session) -> Dict[str, Dict[int, List[Tuple[time, time]]]]:
+    """Get business hours of every store in one query, keyed like get_business_hours"""
+    all_hours = {}
+    rows = db.query(BusinessHours.store_id, BusinessHours.day_of_week, BusinessHours.start_time_local, BusinessHours.end_time_local)
+    for store_id, day, start_time, end_time in rows:
+        all_hours.setdefault(store_id, {}).setdefault(day, []).append((start_time, end_time))
+    return all_hours
+
+def get_bucket_start(timestamp_local: datetime, bucket: str) -> datetime:
+    """Get the naive local start of the hour/day/week bucket containing timestamp_local"""
+    naive = timestamp_local.replace(tzinfo=None)
+    if bucket == "hour":
+        return naive.replace(minute=0, second=0, microsecond=0)
+    day_start = naive.replace(hour=0, minute=0, second=0, microsecond=0)
+    if bucket == "week":
+        return day_start - timedelta(days=day_start.weekday())
+    return day_start
+
+def get_bucket_bounds(timestamp_utc: datetime, tz, bucket: str) -> Tuple[datetime, datetime, str]:
+    """
+    Get the UTC [start, end) bounds and label of the local bucket containing timestamp_utc
+    Bounds are naive UTC datetimes like the ones stored in store_status
+    """
+    local_time = timestamp_utc.replace(tzinfo=pytz.UTC).astimezone(tz)
+    start_local = get_bucket_start(local_time, bucket)
+    step = {"hour": timedelta(hours=1), "day": timedelta(days=1), "week": timedelta(weeks=1)}[bucket]
+    end_local = start_local + step
+    start_utc = tz.localize(start_local).astimezone(pytz.UTC).replace(tzinfo=None)
+    end_utc = tz.localize(end_local).astimezone(pytz.UTC).replace(tzinfo=None)
+    label = start_local.strftime('%Y-%m-%d %H:00' if bucket == "hour" else '%Y-%m-%d')
+    return start_utc, end_utc, label
+
+def calculate_store_trend(
+    observations: List[Tuple[datetime, str]],
+    timezone_str: str,
+    business_hours: Dict[int, List[Tuple[time, time]]],
+    bucket: str
+) -> Dict[str, Dict[str, float]]:
+    """
+    Split the uptime/downtime of one store into local time buckets
+    observations must be sorted (timestamp_utc, status) tuples, counted the same way
+    as calculate_uptime_downtime: each interval takes the status of its first observation,
+    and only the part of it within business hours is counted
+    Returns a dict mapping bucket label to uptime/downtime in hours
+    """
+    tz = pytz.timezone(timezone_str)
+    buckets = {}
+
+    previous = None
+    bucket_start = bucket_end = None
+    label = None
+    for timestamp_utc, status in observations:
+        # Keep only observations within business hours
+        local_time = timestamp_utc.replace(tzinfo=pytz.UTC).astimezone(tz)
+        if not is_within_business_hours(local_time, business_hours):
+            continue
+
+        if previous is not None:
+            interval_start, interval_status = previous
+            key = "uptime" if interval_status == "active" else "downtime"
+
+            # Split the interval at local bucket boundaries
+            while interval_start < timestamp_utc:
+                if bucket_start is None or not (bucket_start <= interval_start < bucket_end):
+                    bucket_start, bucket_end, label = get_bucket_bounds(interval_start, tz, bucket)
+                chunk_end = min(timestamp_utc, bucket_end)
+                # Only the open part of the chunk counts, e.g. not the night between two polls
+                open_time = get_open_time(interval_start, chunk_end, timezone_str, business_hours)
+                totals = buckets.setdefault(label, {"uptime": 0.0, "downtime": 0.0})
+                totals[key] += open_time.total_seconds() / 3600  # in hours
+                interval_start = chunk_end
+
+        previous = (timestamp_utc, status)
+
+    return buckets
+
+def iter_store_observations(db: Session, start_time: datetime, end_time: datetime, chunk_size: int = 10000):
+    """
+    Yield (store_id, observations) for every store with a single sorted scan of store_status
+    """
+    query = db.query(StoreStatus.store_id, StoreStatus.timestamp_utc, StoreStatus.status)\
+        .filter(StoreStatus.timestamp_utc >= start_time)\
+        .filter(StoreStatus.timestamp_utc <= end_time)\
+        .order_by(StoreStatus.store_id, StoreStatus.timestamp_utc)\
+        .yield_per(chunk_size)
+
+    current_store = None
+    observations = []
+    for store_id, timestamp_utc, status in query:
+        if store_id != current_store:
+            if current_store is not None:
+                yield current_store, observations
+            current_store = store_id
+            observations = []
+        observations.append((timestamp_utc, status))
+
+    if current_store is not None:
+        yield current_store, observations
+
+def format_trend_row(totals: Dict[str, float]) -> Tuple[float, float, float]:
+    """Round uptime/downtime hours and compute the uptime percentage of observed time"""
+    uptime = totals["uptime"]
+    downtime = totals["downtime"]
+    observed = uptime + downtime
+    uptime_pct = (uptime / observed * 100) if observed else 0.0
+    return round(uptime, 2), round(downtime, 2), round(uptime_pct, 2)
+
+def generate_trend_report(db: Session, report_id: str, bucket: str = "day", days: int = DEFAULT_TREND_DAYS, layout: str = "long") -> str:
+    """
+    Generate a report of store uptime/downtime per local time bucket over the last `days` days
+    Returns the path to the generated CSV file
+    """
+    current_time = get_current_timestamp(db)
+    start_time = current_time - timedelta(days=days)
+
+    timezones = load_all_timezones(db)
+    all_business_hours = load_all_business_hours(db)
+
+    # Create reports directory if it doesn't exist
+    reports_dir = REPORTS_DIR
+    os.makedirs(reports_dir, exist_ok=True)
+
+    # Create file path
+    file_path = os.path.join(reports_dir, f"{report_id}.csv")
+
+    store_trends = iter_store_observations(db, start_time, current_time)
+
+    with open(file_path, 'w', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+
+        if layout == "long":
+            # One row per store and bucket, written as each store is finished
+            writer.writerow(['store_id', 'bucket_start_local', 'uptime(in hours)', 'downtime(in hours)', 'uptime_pct'])
+            for store_id, observations in store_trends:
+                buckets = calculate_store_trend(
+                    observations,
+                    timezones.get(store_id, DEFAULT_TIMEZONE),
+                    all_business_hours.get(store_id, ALWAYS_OPEN),
+                    bucket
+                )
+                for label in sorted(buckets):
+                    writer.writerow([store_id, label, *format_trend_row(buckets[label])])
+        else:
+            # One row per store with the uptime percentage of every bucket as columns
+            rows = []
+            labels = set()
+            for store_id, observations in store_trends:
+                buckets = calculate_store_trend(
+                    observations,
+                    timezones.get(store_id, DEFAULT_TIMEZONE),
+                    all_business_hours.get(store_id, ALWAYS_OPEN),
+                    bucket
+                )
+                labels.update(buckets)
+                rows.append((store_id, {label: format_trend_row(totals)[2] for label, totals in buckets.items()}))
+
+            labels = sorted(labels)
+            writer.writerow(['store_id', *[f"uptime_pct {label}" for label in labels]])
+            for store_id, pcts in rows:
+                writer.writerow([store_id, *[pcts.get(label, '') for label in labels]])
+
+    return file_path
@@ -8,6 +8,17 @@ from sqlalchemy import func
 from ..models import StoreStatus, BusinessHours, StoreTimezone, Report
 from typing import Dict, List, Tuple, Optional
 
+# Stores without a timezone are assumed to be in America/Chicago
+DEFAULT_TIMEZONE = "America/Chicago"
+
+# Stores without business hours are assumed to be open 24/7
+ALWAYS_OPEN = {day: [(time(0, 0, 0), time(23, 59, 59))] for day in range(7)}
+
+REPORTS_DIR = os.environ.get(
+    "REPORTS_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'reports')
+)
+
 def get_current_timestamp(db: Session) -> datetime:
     """Get the max timestamp from the store_status table as the "current" time"""
     max_timestamp = db.query(func.max(StoreStatus.timestamp_utc)).scalar()
@@ -15,8 +26,14 @@ def get_current_timestamp(db: Session) -> datetime:
 
 def get_store_timezone(store_id: str, db: Session) -> str:
     """Get the timezone for a store, default to America/Chicago if not found"""
+    # Prefer the shared memory-mapped index when it has been built
+    from .metadata_index import get_metadata_index
+    index = get_metadata_index()
+    if index is not None:
+        return index.get_timezone(store_id)
+    
     timezone_record = db.query(StoreTimezone).filter(StoreTimezone.store_id == store_id).first()
-    return timezone_record.timezone_str if timezone_record else "America/Chicago"
+    return timezone_record.timezone_str if timezone_record else DEFAULT_TIMEZONE
 
 def get_business_hours(store_id: str, db: Session) -> Dict[int, List[Tuple[time, time]]]:
     """
@@ -24,6 +41,12 @@ def get_business_hours(store_id: str, db: Session) -> Dict[int, List[Tuple[time,
     Returns a dict mapping day of week (0=Monday, 6=Sunday) to a list of (start_time, end_time) tuples
     If no hours are found, assumes 24/7 operation
     """
+    # Prefer the shared memory-mapped index when it has been built
+    from .metadata_index import get_metadata_index
+    index = get_metadata_index()
+    if index is not None:
+        return index.get_business_hours(store_id)
+    
     hours_records = db.query(BusinessHours).filter(BusinessHours.store_id == store_id).all()
     
     business_hours = {}
@@ -35,9 +58,7 @@ def get_business_hours(store_id: str, db: Session) -> Dict[int, List[Tuple[time,
     
     # If no business hours, assume 24/7
     if not business_hours:
-        # For each day of week, add 00:00 to 23:59:59
-        for day in range(7):
-            business_hours[day] = [(time(0, 0, 0), time(23, 59, 59))]
+        business_hours = {day: list(hours) for day, hours in ALWAYS_OPEN.items()}
     
     return business_hours
 
@@ -49,7 +70,7 @@ def is_within_business_hours(timestamp_local: datetime, business_hours: Dict[int
     day_hours = business_hours.get(day_of_week, [])
     
     # If no specific hours for this day, check if we have 24/7 setup
-    if not day_hours and 0 in business_hours and business_hours[0][0] == (time(0, 0, 0), time(23, 59, 59)):
+    if not day_hours and 0 in business_hours and business_hours[0][0] == ALWAYS_OPEN[0][0]:
         return True
     
     # Check if timestamp is within any business hour interval for this day
@@ -60,6 +81,28 @@ def is_within_business_hours(timestamp_local: datetime, business_hours: Dict[int
     
     return False
 
+def get_open_time(start_utc: datetime, end_utc: datetime, timezone_str: str, business_hours: Dict[int, List[Tuple[time, time]]]) -> timedelta:
+    """
+    Get how much of the UTC interval [start_utc, end_utc) falls within business hours
+    Timestamps are naive UTC like the ones stored in store_status
+    """
+    tz = pytz.timezone(timezone_str)
+    start_local = start_utc.replace(tzinfo=pytz.UTC).astimezone(tz)
+    end_local = end_utc.replace(tzinfo=pytz.UTC).astimezone(tz)
+
+    open_time = timedelta(0)
+    day = start_local.date()
+    while day <= end_local.date():
+        for start_time, end_time in business_hours.get(day.weekday(), []):
+            open_start = tz.localize(datetime.combine(day, start_time)).astimezone(pytz.UTC).replace(tzinfo=None)
+            open_end = tz.localize(datetime.combine(day, end_time)).astimezone(pytz.UTC).replace(tzinfo=None)
+            overlap = min(end_utc, open_end) - max(start_utc, open_start)
+            if overlap > timedelta(0):
+                open_time += overlap
+        day += timedelta(days=1)
+
+    return open_time
+
 def calculate_uptime_downtime(
     store_id: str,
     db: Session,
@@ -184,7 +227,7 @@ def generate_report(db: Session, report_id: str) -> str:
     store_ids = [store_id[0] for store_id in store_ids]
     
     # Create reports directory if it doesn't exist
-    reports_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'reports')
+    reports_dir = REPORTS_DIR
     os.makedirs(reports_dir, exist_ok=True)
     
     # Create file path
@@ -0,0 +1,242 @@
+#run_loadtest.py
+"""
+Load test for /api/trigger_report and /api/get_report/{report_id}
+
+Starts the app in-process with uvicorn against a synthetic SQLite database and drives
+concurrent trigger/poll clients with httpx. Run from the repository root:
+
+    python -m loadtest.run_loadtest --concurrency 32 --duration 30 --trigger-ratio 0.1
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time as time_module
+from datetime import datetime, timedelta, time
+from typing import Dict, List
+
+TIMEZONES = ["America/Chicago", "America/New_York", "America/Denver", "America/Los_Angeles", "Asia/Kolkata"]
+LOCK_MESSAGE = "database is locked"
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load test the report API endpoints")
+    parser.add_argument("--concurrency", type=int, default=16, help="number of concurrent clients")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds to run the load")
+    parser.add_argument("--trigger-ratio", type=float, default=0.1, help="fraction of requests that trigger a report, the rest poll")
+    parser.add_argument("--stores", type=int, default=200, help="stores in the synthetic database")
+    parser.add_argument("--days", type=int, default=7, help="days of hourly polls per store")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for data and request mix")
+    parser.add_argument("--workdir", default=None, help="directory for the synthetic database and reports (default: a temp dir)")
+    parser.add_argument("--json", dest="json_path", default=None, help="also write the results as JSON to this path")
+    return parser.parse_args()
+
+def configure_environment(workdir: str):
+    """Point the app at the synthetic database and keep everything it writes in workdir"""
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'loadtest.db')}"
+    os.environ["METADATA_INDEX_PATH"] = os.path.join(workdir, 'store_metadata.idx')
+    os.environ["ALERT_FILE_PATH"] = os.path.join(workdir, 'downtime_alerts.jsonl')
+    os.environ["REPORTS_DIR"] = os.path.join(workdir, 'reports')
+
+def build_synthetic_db(engine, stores: int, days: int, rng: random.Random):
+    """Create the tables and fill them with hourly polls, timezones and business hours"""
+    from app.models import Base, StoreStatus, BusinessHours, StoreTimezone
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    end_time = datetime(2023, 1, 25, 18, 0, 0)
+    status_rows, hours_rows, timezone_rows = [], [], []
+    for i in range(stores):
+        store_id = f"store-{i:05d}"
+        timezone_rows.append({"store_id": store_id, "timezone_str": rng.choice(TIMEZONES)})
+
+        # Roughly a third of the stores are open 24/7 (no business hours rows)
+        if i % 3:
+            for day in range(7):
+                hours_rows.append({
+                    "store_id": store_id,
+                    "day_of_week": day,
+                    "start_time_local": time(rng.randint(6, 10), 0, 0),
+                    "end_time_local": time(rng.randint(18, 23), 0, 0)
+                })
+
+        uptime = rng.uniform(0.7, 0.99)
+        for hour in range(days * 24):
+            status_rows.append({
+                "store_id": store_id,
+                "timestamp_utc": end_time - timedelta(hours=hour, minutes=rng.randint(0, 59)),
+                "status": "active" if rng.random() < uptime else "inactive"
+            })
+
+    with engine.begin() as conn:
+        conn.execute(StoreTimezone.__table__.insert(), timezone_rows)
+        if hours_rows:
+            conn.execute(BusinessHours.__table__.insert(), hours_rows)
+        conn.execute(StoreStatus.__table__.insert(), status_rows)
+
+    print(f"Synthetic database: {stores} stores, {len(status_rows)} polls, {len(hours_rows)} business hours rows")
+
+def install_lock_counter(engine) -> Dict[str, int]:
+    """Count every DBAPI error mentioning a locked database, in handlers and background tasks alike"""
+    from sqlalchemy import event
+
+    counter = {"database_locked": 0}
+    lock = threading.Lock()
+
+    @event.listens_for(engine, "handle_error")
+    def count_locked(context):
+        if LOCK_MESSAGE in str(context.original_exception):
+            with lock:
+                counter["database_locked"] += 1
+
+    return counter
+
+def start_server(app, port: int):
+    """Run uvicorn in a background thread and wait until it accepts requests"""
+    import uvicorn
+
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("uvicorn server failed to start")
+        time_module.sleep(0.05)
+    return server, thread
+
+def get_free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+async def run_client(client, deadline: float, trigger_ratio: float, rng: random.Random, report_ids: List[str], samples: Dict[str, List]):
+    """One client issuing a trigger/poll mix until the deadline"""
+    while time_module.monotonic() < deadline:
+        if not report_ids or rng.random() < trigger_ratio:
+            endpoint = "trigger_report"
+            method, url = "POST", "/api/trigger_report"
+        else:
+            endpoint = "get_report"
+            method, url = "GET", f"/api/get_report/{rng.choice(report_ids)}"
+
+        start = time_module.perf_counter()
+        try:
+            response = await client.request(method, url)
+            status_code = response.status_code
+            body = response.text
+        except Exception as e:
+            status_code = None
+            body = f"{type(e).__name__}: {e}"
+        latency_ms = (time_module.perf_counter() - start) * 1000
+
+        if endpoint == "trigger_report" and status_code == 200:
+            report_ids.append(response.json()["report_id"])
+
+        samples[endpoint].append((latency_ms, status_code, LOCK_MESSAGE in body))
+
+async def drive_load(base_url: str, args) -> Dict[str, List]:
+    import httpx
+
+    rng = random.Random(args.seed)
+    samples = {"trigger_report": [], "get_report": []}
+    report_ids: List[str] = []
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    deadline = time_module.monotonic() + args.duration
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        await asyncio.gather(*[
+            run_client(client, deadline, args.trigger_ratio, random.Random(rng.random()), report_ids, samples)
+            for _ in range(args.concurrency)
+        ])
+
+    return samples
+
+def summarize(samples: Dict[str, List], elapsed: float) -> Dict[str, Dict]:
+    summary = {}
+    for endpoint, rows in samples.items():
+        latencies = sorted(row[0] for row in rows)
+        errors = sum(1 for row in rows if row[1] is None or row[1] >= 500)
+        summary[endpoint] = {
+            "requests": len(rows),
+            "rps": round(len(rows) / elapsed, 2) if elapsed else 0.0,
+            "error_rate": round(errors / len(rows), 4) if rows else 0.0,
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+            "database_locked_responses": sum(1 for row in rows if row[2])
+        }
+    return summary
+
+def count_report_statuses(session_factory) -> Dict[str, int]:
+    from sqlalchemy import func
+    from app.models import Report
+
+    db = session_factory()
+    try:
+        return {status: count for status, count in db.query(Report.status, func.count(Report.id)).group_by(Report.status)}
+    finally:
+        db.close()
+
+def main():
+    args = parse_args()
+    workdir = args.workdir or tempfile.mkdtemp(prefix="store_monitoring_loadtest_")
+    os.makedirs(workdir, exist_ok=True)
+    configure_environment(workdir)
+
+    # Import only after the environment points at the synthetic database
+    from app.db import engine, SessionLocal
+    from app.main import app
+
+    build_synthetic_db(engine, args.stores, args.days, random.Random(args.seed))
+    lock_counter = install_lock_counter(engine)
+
+    port = get_free_port()
+    server, thread = start_server(app, port)
+    print(f"Driving {args.concurrency} clients for {args.duration}s (trigger ratio {args.trigger_ratio}) against port {port}")
+
+    started = time_module.monotonic()
+    try:
+        samples = asyncio.run(drive_load(f"http://127.0.0.1:{port}", args))
+    finally:
+        elapsed = time_module.monotonic() - started
+        server.should_exit = True
+        thread.join(timeout=30)
+
+    results = {
+        "config": vars(args),
+        "endpoints": summarize(samples, elapsed),
+        "database_locked_errors": lock_counter["database_locked"],
+        "report_statuses": count_report_statuses(SessionLocal)
+    }
+
+    print(f"\n{'endpoint':<16}{'requests':>10}{'rps':>10}{'errors':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for endpoint, stats in results["endpoints"].items():
+        print(f"{endpoint:<16}{stats['requests']:>10}{stats['rps']:>10}{stats['error_rate']:>10.2%}"
+              f"{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}")
+    print(f"\n'{LOCK_MESSAGE}' errors raised by SQLite: {results['database_locked_errors']}")
+    print(f"Report statuses after the run: {results['report_statuses']}")
+    print(f"Synthetic database and reports kept in {workdir}")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.json_path}")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,18 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.models import Base
+
+@pytest.fixture
+def db(monkeypatch, tmp_path):
+    """In-memory database, with metadata lookups going to SQLite rather than an index on disk"""
+    monkeypatch.setattr("app.utils.metadata_index.DEFAULT_INDEX_PATH", str(tmp_path / "missing.idx"))
+    # One shared connection so request threads (TestClient) see the same database
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
@@ -0,0 +1,91 @@
+import json
+from datetime import datetime, time, timedelta
+import pytest
+from app.models import BusinessHours, StoreTimezone
+from app.utils.alert_engine import DowntimeAlertEngine, FileAlertSink
+from app.utils.uptime_calculator import get_open_time
+
+class ListSink:
+    def __init__(self):
+        self.alerts = []
+
+    def send(self, alert):
+        self.alerts.append(alert)
+
+@pytest.fixture
+def store(db):
+    """Store open 09:00-17:00 UTC every day"""
+    db.add(StoreTimezone(store_id="s1", timezone_str="UTC"))
+    for day in range(7):
+        db.add(BusinessHours(store_id="s1", day_of_week=day, start_time_local=time(9), end_time_local=time(17)))
+    db.commit()
+    return "s1"
+
+def test_get_open_time_clips_to_business_hours():
+    hours = {day: [(time(9), time(17))] for day in range(7)}
+    start = datetime(2023, 1, 2, 16, 50)
+    assert get_open_time(start, datetime(2023, 1, 3, 9, 10), "UTC", hours) == timedelta(minutes=20)
+    assert get_open_time(start, datetime(2023, 1, 2, 16, 55), "UTC", hours) == timedelta(minutes=5)
+    assert get_open_time(datetime(2023, 1, 2, 18), datetime(2023, 1, 3, 8), "UTC", hours) == timedelta(0)
+
+def test_get_open_time_uses_local_time():
+    hours = {day: [(time(9), time(17))] for day in range(7)}
+    # 15:00-16:00 UTC is 09:00-10:00 in Chicago (UTC-6 in January)
+    assert get_open_time(datetime(2023, 1, 2, 14), datetime(2023, 1, 2, 16), "America/Chicago", hours) == timedelta(hours=1)
+
+def test_alert_after_threshold_of_open_downtime(db, store):
+    engine = DowntimeAlertEngine(ListSink(), threshold_minutes=30)
+    start = datetime(2023, 1, 2, 10)
+    statuses = ["active", "inactive", "inactive", "inactive", "inactive", "inactive"]
+    alerts = [engine.process_poll(db, store, start + timedelta(minutes=15 * i), status) for i, status in enumerate(statuses)]
+
+    # 30 minutes of downtime is not more than the threshold yet
+    assert alerts[:4] == [None, None, None, None]
+    assert alerts[4]["inactive_minutes"] == 45.0
+    assert alerts[4]["inactive_since_utc"] == "2023-01-02T10:15:00"
+    # Only one alert per run
+    assert alerts[5] is None
+
+def test_overnight_gap_counts_only_open_minutes(db, store):
+    engine = DowntimeAlertEngine(ListSink(), threshold_minutes=60)
+    assert engine.process_poll(db, store, datetime(2023, 1, 2, 16, 50), "inactive") is None
+    assert engine.process_poll(db, store, datetime(2023, 1, 3, 9, 10), "inactive") is None
+
+    alert = engine.process_poll(db, store, datetime(2023, 1, 3, 10, 0), "inactive")
+    assert alert["inactive_minutes"] == 70.0
+
+def test_active_poll_resets_run(db, store):
+    engine = DowntimeAlertEngine(ListSink(), threshold_minutes=30)
+    start = datetime(2023, 1, 2, 10)
+    engine.process_poll(db, store, start, "inactive")
+    engine.process_poll(db, store, start + timedelta(minutes=20), "active")
+    engine.process_poll(db, store, start + timedelta(minutes=40), "inactive")
+    assert engine.process_poll(db, store, start + timedelta(minutes=60), "inactive") is None
+
+    alert = engine.process_poll(db, store, start + timedelta(minutes=80), "inactive")
+    assert alert["inactive_minutes"] == 40.0
+    assert alert["inactive_since_utc"] == "2023-01-02T10:40:00"
+
+def test_out_of_order_polls_are_ignored(db, store):
+    engine = DowntimeAlertEngine(ListSink(), threshold_minutes=30)
+    start = datetime(2023, 1, 2, 10)
+    engine.process_poll(db, store, start, "inactive")
+    engine.process_poll(db, store, start + timedelta(minutes=20), "inactive")
+    assert engine.process_poll(db, store, start + timedelta(minutes=10), "active") is None
+    assert engine.process_poll(db, store, start + timedelta(minutes=40), "inactive") is not None
+
+def test_send_alert_swallows_sink_errors():
+    class FailingSink:
+        def send(self, alert):
+            raise OSError("webhook down")
+
+    DowntimeAlertEngine(FailingSink()).send_alert({"store_id": "s1"})
+
+def test_file_sink_creates_directory_on_first_alert(tmp_path):
+    file_path = tmp_path / "alerts" / "downtime_alerts.jsonl"
+    sink = FileAlertSink(str(file_path))
+    assert not file_path.parent.exists()
+
+    sink.send({"store_id": "s1"})
+    sink.send({"store_id": "s2"})
+    assert [json.loads(line)["store_id"] for line in file_path.read_text().splitlines()] == ["s1", "s2"]
@@ -0,0 +1,101 @@
+from datetime import time
+import pytest
+from app.models import BusinessHours, StoreTimezone
+from app.utils.metadata_index import (
+    MetadataIndex, build_metadata_index, ensure_metadata_index, get_metadata_index
+)
+from app.utils.uptime_calculator import get_business_hours, get_store_timezone
+
+TIMEZONES = ["Asia/Kolkata", "America/New_York", "America/Chicago", "Europe/London"]
+
+@pytest.fixture
+def stores(db):
+    """A few hundred stores, some with only a timezone, some with only business hours"""
+    store_ids = [f"store-{i}" for i in range(300)] + [""]
+    for i, store_id in enumerate(store_ids):
+        if i % 5:
+            db.add(StoreTimezone(store_id=store_id, timezone_str=TIMEZONES[i % len(TIMEZONES)]))
+        if i % 3:
+            db.add(BusinessHours(store_id=store_id, day_of_week=i % 7, start_time_local=time(9, 30), end_time_local=time(22, 0, 5)))
+            db.add(BusinessHours(store_id=store_id, day_of_week=(i + 1) % 7, start_time_local=time(8), end_time_local=time(12)))
+    db.commit()
+    return store_ids
+
+def test_lookups_match_database(db, stores, tmp_path):
+    index = MetadataIndex(build_metadata_index(db, str(tmp_path / "metadata.idx")))
+    try:
+        for store_id in stores + ["missing-store"]:
+            assert index.get_timezone(store_id) == get_store_timezone(store_id, db)
+            assert index.get_business_hours(store_id) == get_business_hours(store_id, db)
+    finally:
+        index.close()
+
+def test_empty_store_id_is_found(db, tmp_path):
+    db.add(StoreTimezone(store_id="", timezone_str="Asia/Kolkata"))
+    db.commit()
+    index = MetadataIndex(build_metadata_index(db, str(tmp_path / "metadata.idx")))
+    try:
+        assert index.get_timezone("") == "Asia/Kolkata"
+        assert index.get_timezone("other") == "America/Chicago"
+    finally:
+        index.close()
+
+def test_empty_index(db, tmp_path):
+    index = MetadataIndex(build_metadata_index(db, str(tmp_path / "metadata.idx")))
+    try:
+        assert index.store_count == 0
+        assert index.get_timezone("s1") == "America/Chicago"
+        assert index.get_business_hours("s1")[0] == [(time(0, 0, 0), time(23, 59, 59))]
+    finally:
+        index.close()
+
+def test_rebuilt_file_is_remapped(db, tmp_path):
+    index_path = str(tmp_path / "metadata.idx")
+    db.add(StoreTimezone(store_id="s1", timezone_str="Asia/Kolkata"))
+    db.commit()
+    build_metadata_index(db, index_path)
+    assert get_metadata_index(index_path).get_timezone("s1") == "Asia/Kolkata"
+
+    db.query(StoreTimezone).delete()
+    db.add(StoreTimezone(store_id="s1", timezone_str="Europe/London"))
+    db.commit()
+    build_metadata_index(db, index_path)
+    assert get_metadata_index(index_path).get_timezone("s1") == "Europe/London"
+
+def test_missing_index(tmp_path):
+    assert get_metadata_index(str(tmp_path / "missing.idx")) is None
+
+def test_ensure_rebuilds_stale_index(db, tmp_path):
+    index_path = str(tmp_path / "metadata.idx")
+    db.add(StoreTimezone(store_id="s1", timezone_str="Asia/Kolkata"))
+    db.commit()
+    index = ensure_metadata_index(db, index_path)
+    assert index.get_timezone("s2") == "America/Chicago"
+
+    # Unchanged database keeps the same file
+    assert ensure_metadata_index(db, index_path).inode == index.inode
+
+    db.add(StoreTimezone(store_id="s2", timezone_str="Europe/London"))
+    db.commit()
+    assert ensure_metadata_index(db, index_path).get_timezone("s2") == "Europe/London"
+
+def test_ensure_rebuilds_index_from_another_database(db, tmp_path):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.models import Base
+
+    index_path = str(tmp_path / "metadata.idx")
+    db.add(StoreTimezone(store_id="s1", timezone_str="Asia/Kolkata"))
+    db.commit()
+    ensure_metadata_index(db, index_path)
+
+    # Same row counts, different file
+    other_engine = create_engine(f"sqlite:///{tmp_path / 'other.db'}")
+    Base.metadata.create_all(bind=other_engine)
+    other_db = sessionmaker(bind=other_engine)()
+    try:
+        other_db.add(StoreTimezone(store_id="s1", timezone_str="Europe/London"))
+        other_db.commit()
+        assert ensure_metadata_index(other_db, index_path).get_timezone("s1") == "Europe/London"
+    finally:
+        other_db.close()
@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.background import BackgroundTasks
+from app.api import routes
+from app.db import get_db
+from app.models import StoreStatus
+from app.utils.alert_engine import DowntimeAlertEngine
+
+class ListSink:
+    def __init__(self):
+        self.alerts = []
+
+    def send(self, alert):
+        self.alerts.append(alert)
+
+@pytest.fixture
+def client(db, monkeypatch):
+    app = FastAPI()
+    app.include_router(routes.router, prefix="/api")
+    app.dependency_overrides[get_db] = lambda: db
+    monkeypatch.setattr(routes, "alert_engine", DowntimeAlertEngine(ListSink(), threshold_minutes=30))
+    return TestClient(app)
+
+def test_poll_is_stored(client, db):
+    response = client.post("/api/store_status", json={"store_id": "s1", "timestamp_utc": "2023-01-02T10:00:00", "status": "active"})
+    assert response.status_code == 200
+    assert response.json()["alert"] is None
+
+    stored = db.query(StoreStatus).filter(StoreStatus.id == response.json()["id"]).one()
+    assert (stored.store_id, stored.timestamp_utc, stored.status) == ("s1", datetime(2023, 1, 2, 10), "active")
+
+def test_aware_timestamp_is_stored_as_naive_utc(client, db):
+    response = client.post("/api/store_status", json={"store_id": "s1", "timestamp_utc": "2023-01-02T11:30:00+01:00", "status": "active"})
+    stored = db.query(StoreStatus).filter(StoreStatus.id == response.json()["id"]).one()
+    assert stored.timestamp_utc == datetime(2023, 1, 2, 10, 30)
+
+def test_invalid_status_is_rejected(client, db):
+    response = client.post("/api/store_status", json={"store_id": "s1", "timestamp_utc": "2023-01-02T10:00:00", "status": "unknown"})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "status"]
+    assert db.query(StoreStatus).count() == 0
+
+def test_alert_is_sent_in_background_task(client, monkeypatch):
+    scheduled = []
+    add_task = BackgroundTasks.add_task
+
+    def record_add_task(self, func, *args, **kwargs):
+        scheduled.append((func, args))
+        add_task(self, func, *args, **kwargs)
+
+    monkeypatch.setattr(BackgroundTasks, "add_task", record_add_task)
+
+    start = datetime(2023, 1, 2, 10)
+    for i in range(4):
+        response = client.post("/api/store_status", json={
+            "store_id": "s1",
+            "timestamp_utc": (start + timedelta(minutes=15 * i)).isoformat(),
+            "status": "inactive"
+        })
+
+    alert = response.json()["alert"]
+    assert alert["inactive_minutes"] == 45.0
+    assert scheduled == [(routes.alert_engine.send_alert, (alert,))]
+    assert routes.alert_engine.sink.alerts == [alert]
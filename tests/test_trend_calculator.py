@@ -0,0 +1,99 @@
+import csv
+from datetime import datetime, time, timedelta
+import pytest
+import pytz
+from app.models import BusinessHours, StoreStatus, StoreTimezone
+from app.utils.trend_calculator import calculate_store_trend, generate_trend_report, get_bucket_bounds
+from app.utils.uptime_calculator import ALWAYS_OPEN
+
+NINE_TO_FIVE = {day: [(time(9), time(17))] for day in range(7)}
+
+def hourly(start, hours, status="active"):
+    return [(start + timedelta(hours=i), status) for i in range(hours)]
+
+def test_bucket_bounds_labels():
+    chicago = pytz.timezone("America/Chicago")
+    # 2023-01-03 03:30 UTC is 2023-01-02 21:30 in Chicago
+    assert get_bucket_bounds(datetime(2023, 1, 3, 3, 30), chicago, "day") == \
+        (datetime(2023, 1, 2, 6), datetime(2023, 1, 3, 6), "2023-01-02")
+    assert get_bucket_bounds(datetime(2023, 1, 3, 3, 30), chicago, "hour") == \
+        (datetime(2023, 1, 3, 3), datetime(2023, 1, 3, 4), "2023-01-02 21:00")
+    # Weeks start on the local Monday
+    assert get_bucket_bounds(datetime(2023, 1, 5, 12), chicago, "week") == \
+        (datetime(2023, 1, 2, 6), datetime(2023, 1, 9, 6), "2023-01-02")
+
+def test_day_buckets_split_at_local_midnight():
+    # One poll before and one after midnight in Chicago (06:00 UTC)
+    observations = [(datetime(2023, 1, 3, 4), "active"), (datetime(2023, 1, 3, 8), "inactive"), (datetime(2023, 1, 3, 9), "active")]
+    buckets = calculate_store_trend(observations, "America/Chicago", ALWAYS_OPEN, "day")
+    assert buckets["2023-01-02"]["uptime"] == pytest.approx(2, abs=0.01)
+    assert buckets["2023-01-03"] == pytest.approx({"uptime": 2.0, "downtime": 1.0}, abs=0.01)
+
+def test_hour_buckets():
+    observations = [(datetime(2023, 1, 2, 10, 30), "active"), (datetime(2023, 1, 2, 12, 30), "inactive"), (datetime(2023, 1, 2, 13), "active")]
+    buckets = calculate_store_trend(observations, "UTC", ALWAYS_OPEN, "hour")
+    assert buckets == {
+        "2023-01-02 10:00": {"uptime": 0.5, "downtime": 0.0},
+        "2023-01-02 11:00": {"uptime": 1.0, "downtime": 0.0},
+        "2023-01-02 12:00": {"uptime": 0.5, "downtime": 0.5},
+    }
+
+def test_week_buckets():
+    # Sunday 2023-01-08 00:00 to Tuesday 2023-01-10 17:00 in UTC
+    buckets = calculate_store_trend(hourly(datetime(2023, 1, 8), 66), "UTC", NINE_TO_FIVE, "week")
+    assert buckets == {"2023-01-02": {"uptime": 8.0, "downtime": 0.0}, "2023-01-09": {"uptime": 16.0, "downtime": 0.0}}
+
+def test_dst_day_is_23_hours():
+    # Chicago springs forward on 2023-03-12; local midnights are 06:00 and 05:00 UTC
+    buckets = calculate_store_trend(hourly(datetime(2023, 3, 11, 6), 72), "America/Chicago", ALWAYS_OPEN, "day")
+    assert buckets["2023-03-11"]["uptime"] == pytest.approx(24, abs=0.01)
+    assert buckets["2023-03-12"]["uptime"] == pytest.approx(23, abs=0.01)
+
+def test_dst_hour_buckets_skip_missing_hour():
+    buckets = calculate_store_trend(hourly(datetime(2023, 3, 12, 6), 4), "America/Chicago", ALWAYS_OPEN, "hour")
+    assert sorted(buckets) == ["2023-03-12 00:00", "2023-03-12 01:00", "2023-03-12 03:00"]
+
+def test_closed_hours_are_not_counted():
+    buckets = calculate_store_trend(hourly(datetime(2023, 1, 2), 48), "UTC", NINE_TO_FIVE, "day")
+    assert buckets == {"2023-01-02": {"uptime": 8.0, "downtime": 0.0}, "2023-01-03": {"uptime": 8.0, "downtime": 0.0}}
+
+def test_overnight_gap_does_not_take_last_status():
+    # Inactive at closing, active again the next morning
+    observations = [(datetime(2023, 1, 2, 16), "inactive"), (datetime(2023, 1, 3, 9), "active"), (datetime(2023, 1, 3, 10), "active")]
+    buckets = calculate_store_trend(observations, "UTC", NINE_TO_FIVE, "day")
+    assert buckets == {"2023-01-02": {"uptime": 0.0, "downtime": 1.0}, "2023-01-03": {"uptime": 1.0, "downtime": 0.0}}
+
+@pytest.fixture
+def trend_db(db, tmp_path, monkeypatch):
+    monkeypatch.setattr("app.utils.trend_calculator.REPORTS_DIR", str(tmp_path))
+    db.add(StoreTimezone(store_id="s1", timezone_str="UTC"))
+    for day in range(7):
+        db.add(BusinessHours(store_id="s1", day_of_week=day, start_time_local=time(9), end_time_local=time(17)))
+    # s1 is down all of its second day, s2 has no metadata and is open 24/7 in Chicago
+    for timestamp, status in hourly(datetime(2023, 1, 2), 24) + hourly(datetime(2023, 1, 3), 25, "inactive"):
+        db.add(StoreStatus(store_id="s1", timestamp_utc=timestamp, status=status))
+    for timestamp, status in hourly(datetime(2023, 1, 2, 6), 25):
+        db.add(StoreStatus(store_id="s2", timestamp_utc=timestamp, status=status))
+    db.commit()
+    return db
+
+def read_csv(path):
+    with open(path, newline='') as f:
+        return list(csv.reader(f))
+
+def test_generate_long_layout(trend_db):
+    rows = read_csv(generate_trend_report(trend_db, "long-report", bucket="day", days=5, layout="long"))
+    assert rows == [
+        ["store_id", "bucket_start_local", "uptime(in hours)", "downtime(in hours)", "uptime_pct"],
+        ["s1", "2023-01-02", "8.0", "0.0", "100.0"],
+        ["s1", "2023-01-03", "0.0", "8.0", "0.0"],
+        ["s2", "2023-01-02", "24.0", "0.0", "100.0"],
+    ]
+
+def test_generate_wide_layout(trend_db):
+    rows = read_csv(generate_trend_report(trend_db, "wide-report", bucket="day", days=5, layout="wide"))
+    assert rows == [
+        ["store_id", "uptime_pct 2023-01-02", "uptime_pct 2023-01-03"],
+        ["s1", "100.0", "0.0"],
+        ["s2", "100.0", ""],
+    ]